@@ -5,7 +5,7 @@ import asyncio
 import os
 import json
 import datetime
-from typing import List, Dict
+from typing import List, Dict, Iterator, Tuple, Set, Collection, Optional
 import hashlib
 from pathlib import Path
 import yaml
@@ -50,6 +50,12 @@ if DATA_CHANNEL_ID is None:
 # File Paths
 CSV_PATH = Path("data/insider_trades.csv")
 PERSISTENCE_FILE = Path("data/processed_trades.json")
+EVENT_LOG_FILE = Path("data/event_log.jsonl")  # Append-only record of ingested trades, see simulator.py
+
+# Raw columns written by openinsider_scraper.py
+TRADE_COLUMNS = ['transaction_date', 'trade_date', 'ticker', 'company_name',
+                 'owner_name', 'Title', 'transaction_type', 'last_price',
+                 'Qty', 'shares_held', 'Owned', 'Value']
 
 if not os.path.exists("data"):
     os.makedirs("data")
@@ -75,6 +81,13 @@ def generate_trade_id(row) -> str:
     return hashlib.sha256(raw_str.encode()).hexdigest()
 
 
+def generate_trade_ids(df: pd.DataFrame) -> pd.Series:
+    """Same IDs as generate_trade_id, built column-wise for a whole DataFrame."""
+    raw = (df['transaction_date'].astype(str) + df['ticker'].astype(str) + df['owner_name'].astype(str)
+           + df['Qty'].astype(str) + df['Value'].astype(str))
+    return raw.map(lambda raw_str: hashlib.sha256(raw_str.encode()).hexdigest())
+
+
 def load_persistence() -> List[str]:
     """Loads list of processed trade IDs."""
     if not os.path.exists(PERSISTENCE_FILE):
@@ -92,6 +105,64 @@ def save_persistence(processed_ids: List[str]):
         json.dump(processed_ids, f)
 
 
+def load_event_log(path: Path = EVENT_LOG_FILE) -> List[Dict]:
+    """Loads all recorded trade events, skipping unreadable lines."""
+    if not os.path.exists(path):
+        return []
+    events = []
+    with open(path, 'r') as f:
+        for line in f:
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return events
+
+
+def load_logged_ids() -> Set[str]:
+    """Loads IDs of trades already recorded in the event log."""
+    return {event['trade_id'] for event in load_event_log() if 'trade_id' in event}
+
+
+def record_events(df: pd.DataFrame, scraped_at: datetime.datetime, period: int, logged_ids: Set[str]) -> int:
+    """Appends trades not in logged_ids to the event log, stamped with the scrape time
+    and the live scan period. Returns count written."""
+    trade_ids = generate_trade_ids(df)
+    new_rows = ~trade_ids.isin(logged_ids)
+    if not new_rows.any():
+        return 0
+
+    columns = [col for col in TRADE_COLUMNS if col in df.columns]
+    records = df.loc[new_rows, columns].to_dict('records')
+    with open(EVENT_LOG_FILE, 'a') as f:
+        for record, trade_id in zip(records, trade_ids[new_rows]):
+            event = {col: (None if pd.isnull(value) else str(value)) for col, value in record.items()}
+            event['trade_id'] = trade_id
+            event['scraped_at'] = scraped_at.isoformat()
+            event['period'] = period
+            f.write(json.dumps(event) + '\n')
+            logged_ids.add(trade_id)
+    return len(records)
+
+
+def prepare_data(df: pd.DataFrame) -> pd.DataFrame:
+    """Cleans data types of raw trade rows. Returns empty DataFrame if columns are missing."""
+    # Ensure required columns exist
+    required_cols = ['trade_date', 'Qty', 'Value', 'last_price', 'transaction_date']
+    if not all(col in df.columns for col in required_cols):
+        return pd.DataFrame()
+
+    # Clean numerical columns
+    df['clean_qty'] = df['Qty'].apply(clean_currency)
+    df['clean_value'] = df['Value'].apply(clean_currency)
+    df['clean_price'] = df['last_price'].apply(clean_currency)
+
+    # Convert dates
+    df['trade_date_dt'] = pd.to_datetime(df['trade_date'], errors='coerce')
+
+    return df
+
+
 def get_data() -> pd.DataFrame:
     """Reads CSV, cleans data types, and returns DataFrame."""
     if not os.path.exists(CSV_PATH):
@@ -100,25 +171,43 @@ def get_data() -> pd.DataFrame:
         return pd.DataFrame()
 
     try:
-        df = pd.read_csv(CSV_PATH)
+        return prepare_data(pd.read_csv(CSV_PATH))
+    except Exception as e:
+        print(f"Error reading CSV: {e}")
+        return pd.DataFrame()
 
-        # Ensure required columns exist
-        required_cols = ['trade_date', 'Qty', 'Value', 'last_price', 'transaction_date']
-        if not all(col in df.columns for col in required_cols):
-            return pd.DataFrame()
 
-        # Clean numerical columns
-        df['clean_qty'] = df['Qty'].apply(clean_currency)
-        df['clean_value'] = df['Value'].apply(clean_currency)
-        df['clean_price'] = df['last_price'].apply(clean_currency)
+def select_alerts(df: pd.DataFrame, processed_ids: Collection[str], now: datetime.datetime, force: bool = False,
+                  min_qty: Optional[float] = None, max_date: Optional[int] = None,
+                  spec_qty: Optional[float] = None, spec_date: Optional[int] = None
+                  ) -> Iterator[Tuple[str, pd.Series, bool]]:
+    """Yields (trade_id, row, is_special) for each trade that should be sent.
 
-        # Convert dates
-        df['trade_date_dt'] = pd.to_datetime(df['trade_date'], errors='coerce')
+    Thresholds default to the bot_config.yaml values; the simulator overrides them.
+    """
+    min_qty = minimum_quantity if min_qty is None else min_qty
+    max_date = maximum_date if max_date is None else max_date
+    spec_qty = special_quantity if spec_qty is None else spec_qty
+    spec_date = special_date if spec_date is None else spec_date
 
-        return df
-    except Exception as e:
-        print(f"Error reading CSV: {e}")
-        return pd.DataFrame()
+    # Base Filter: within max_date days AND Qty > min_qty
+    mask_date = (now - df['trade_date_dt']).dt.days <= max_date
+    mask_qty = df['clean_qty'] > min_qty
+    filtered_df = df[mask_date & mask_qty]
+
+    for index, row in filtered_df.iterrows():
+        trade_id = generate_trade_id(row)
+
+        # Check persistence
+        if trade_id in processed_ids and not force:
+            continue
+
+        # Special Logic
+        # Special if: <= spec_date days ago OR Qty > spec_qty
+        days_diff = (now - row['trade_date_dt']).days
+        is_special = (days_diff <= spec_date) or (row['clean_qty'] > spec_qty)
+
+        yield trade_id, row, is_special
 
 
 # -------------------------------------------------------------------------
@@ -131,6 +220,7 @@ bot = commands.Bot(command_prefix='!', intents=intents)
 
 # State management
 bot.scanner_running = False
+bot.logged_ids = None  # Trade IDs already in the event log, loaded on first scan
 
 @bot.event
 async def on_ready():
@@ -206,7 +296,8 @@ async def scanner_loop(force=False) -> None:
 
     try:
         # 1. Run Scraper
-        await asyncio.create_subprocess_shell('python3 openinsider_scraper.py')
+        proc = await asyncio.create_subprocess_shell('python3 openinsider_scraper.py')
+        await proc.wait()
 
         # 2. Load Data
         df = get_data()
@@ -219,23 +310,7 @@ async def scanner_loop(force=False) -> None:
             # 3. Filter Logic
             now = datetime.datetime.now()
 
-            # Base Filter: Last 5 days AND Qty > 20,000
-            mask_date = (now - df['trade_date_dt']).dt.days <= maximum_date
-            mask_qty = df['clean_qty'] > minimum_quantity
-            filtered_df = df[mask_date & mask_qty]
-
-            for index, row in filtered_df.iterrows():
-                trade_id = generate_trade_id(row)
-
-                # Check persistence
-                if trade_id in new_processed_ids and not force:
-                    continue
-
-                # Special Logic
-                # Special if: <= 2 days ago OR Qty > 300,000
-                days_diff = (now - row['trade_date_dt']).days
-                is_special = (days_diff <= special_date) or (row['clean_qty'] > special_quantity)
-
+            for trade_id, row, is_special in select_alerts(df, new_processed_ids, now, force):
                 # Send Embed
                 embed = create_trade_embed(row, is_special)
                 await data_channel.send(embed=embed)
@@ -245,6 +320,15 @@ async def scanner_loop(force=False) -> None:
             # Update persistence
             save_persistence(new_processed_ids)
 
+            # Record for simulator.py, stamped with when the scraper wrote the CSV
+            try:
+                scraped_at = datetime.datetime.fromtimestamp(CSV_PATH.stat().st_mtime)
+                if bot.logged_ids is None or not EVENT_LOG_FILE.exists():
+                    bot.logged_ids = await asyncio.to_thread(load_logged_ids)
+                await asyncio.to_thread(record_events, df, scraped_at, timespan, bot.logged_ids)
+            except Exception as e:
+                print(f"Error writing event log: {e}")
+
             print('Scanner loop completed')
 
     except Exception as e:
@@ -0,0 +1,157 @@
+import argparse
+import sys
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from bot import (
+    EVENT_LOG_FILE, timespan, minimum_quantity, maximum_date, special_quantity, special_date,
+    load_event_log, prepare_data, select_alerts,
+)
+
+# -------------------------------------------------------------------------
+# Offline replay of the event log through the scanner_loop alert logic
+# -------------------------------------------------------------------------
+
+
+def load_events(path: Path) -> pd.DataFrame:
+    """Reads the event log into a cleaned DataFrame sorted by scrape time."""
+    events = load_event_log(path)
+    if not events:
+        return pd.DataFrame()
+
+    df = prepare_data(pd.DataFrame(events))
+    if df.empty:
+        return df
+
+    df['scraped_at_dt'] = pd.to_datetime(df['scraped_at'], errors='coerce')
+    df['transaction_date_dt'] = pd.to_datetime(df['transaction_date'], errors='coerce')
+    df = df.dropna(subset=['scraped_at_dt'])
+    return df.sort_values('scraped_at_dt').reset_index(drop=True)
+
+
+def recorded_period(df: pd.DataFrame) -> Optional[int]:
+    """Returns the longest live scan period the log was recorded at, in minutes.
+
+    Trades are only logged once per live scan, so a replay cannot be finer than this.
+    """
+    if 'period' not in df.columns:
+        return None
+    periods = pd.to_numeric(df['period'], errors='coerce').dropna()
+    return int(periods.max()) if not periods.empty else None
+
+
+def simulate(df: pd.DataFrame, period: int, min_qty: float, max_date: int,
+             spec_qty: float, spec_date: int) -> pd.DataFrame:
+    """Replays events on a virtual clock ticking every `period` minutes.
+
+    A trade is only picked up on the first tick at or after it was scraped. Since the
+    date filter only tightens as time passes, that first tick decides whether it alerts,
+    so only ticks that received new events need evaluating.
+
+    Trades scraped on the first recorded scan, or filed before it, were already waiting
+    when logging started. Their alerts are flagged as backlog since their delay says
+    nothing about the scan period.
+    """
+    start = df['scraped_at_dt'].iloc[0]
+    step = pd.Timedelta(minutes=period)
+
+    # Tick at which each event first becomes visible to the scanner
+    elapsed = df['scraped_at_dt'] - start
+    ticks = start + (-(-elapsed // step)) * step
+
+    processed_ids = set()
+    alerts = []
+    for tick, group in df.groupby(ticks, sort=True):
+        now = tick.to_pydatetime()
+        for trade_id, row, is_special in select_alerts(group, processed_ids, now, False,
+                                                       min_qty, max_date, spec_qty, spec_date):
+            processed_ids.add(trade_id)
+            alerts.append({
+                'ticker': row['ticker'],
+                'trade_date': row['trade_date'],
+                'Qty': row['Qty'],
+                'is_special': is_special,
+                'alerted_at': tick,
+                'filing_delay': tick - row['transaction_date_dt'],
+                'backlog': row['scraped_at_dt'] == start or row['transaction_date_dt'] < start,
+            })
+
+    return pd.DataFrame(alerts)
+
+
+def format_delay(delta) -> str:
+    if pd.isnull(delta):
+        return "N/A"
+    return str(pd.Timedelta(delta).floor('s'))
+
+
+def print_report(df: pd.DataFrame, alerts: pd.DataFrame, verbose: bool = False) -> None:
+    first = df['scraped_at_dt'].iloc[0]
+    last = df['scraped_at_dt'].iloc[-1]
+    print(f"Replayed {len(df)} trades scraped between {first} and {last}")
+
+    if alerts.empty:
+        print("No alerts would fire.")
+        return
+
+    backlog = alerts[alerts['backlog']]
+    fresh = alerts[~alerts['backlog']]
+
+    special_count = int(fresh['is_special'].sum())
+    print(f"Alerts: {len(fresh)} ({special_count} special, {len(fresh) - special_count} normal)")
+    if not backlog.empty:
+        print(f"Backlog alerts: {len(backlog)} (trades already filed when logging started, not counted above)")
+
+    delays = fresh['filing_delay'].dropna()
+    if not delays.empty:
+        print(f"Delay after filing: mean {format_delay(delays.mean())}, "
+              f"median {format_delay(delays.median())}, max {format_delay(delays.max())}")
+
+    if verbose:
+        print()
+        for index, alert in alerts.iterrows():
+            marker = "*" if alert['is_special'] else " "
+            if alert['backlog']:
+                marker += " (backlog)"
+            print(f"{marker} {alert['alerted_at']} | {alert['ticker']} | Date: {alert['trade_date']} | "
+                  f"Qty: {alert['Qty']} | late by {format_delay(alert['filing_delay'])}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Replay the recorded event log through the alert logic, offline. "
+                    "Defaults come from bot_config.yaml.")
+    parser.add_argument('--log', type=Path, default=EVENT_LOG_FILE, help="event log to replay")
+    parser.add_argument('--period', type=int, default=timespan, help="scan interval in minutes")
+    parser.add_argument('--quantity', type=float, default=minimum_quantity, help="filter.quantity")
+    parser.add_argument('--date', type=int, default=maximum_date, help="filter.date")
+    parser.add_argument('--special-quantity', type=float, default=special_quantity, help="special.quantity")
+    parser.add_argument('--special-date', type=int, default=special_date, help="special.date")
+    parser.add_argument('-v', '--verbose', action='store_true', help="list every alert")
+    args = parser.parse_args()
+
+    if args.period <= 0:
+        parser.error("--period must be a positive number of minutes")
+    if args.date < 0 or args.special_date < 0:
+        parser.error("--date and --special-date cannot be negative")
+
+    df = load_events(args.log)
+    if df.empty:
+        print(f"No events found in {args.log}")
+        return
+
+    live_period = recorded_period(df)
+    if live_period is not None and args.period < live_period:
+        print(f"Warning: --period {args.period} is finer than the {live_period} minute period the log was "
+              f"recorded at. Trades were only logged once per live scan, so alerts cannot appear earlier "
+              f"than they did live and the reported delays are an upper bound.",
+              file=sys.stderr)
+
+    alerts = simulate(df, args.period, args.quantity, args.date, args.special_quantity, args.special_date)
+    print_report(df, alerts, args.verbose)
+
+
+if __name__ == "__main__":
+    main()